@@ -538,6 +538,21 @@ if mode == "live" and points and not denied_found:
         "--points",
         str(points_file),
     ], env=env)
+    # Publish the new collection version so MCP search caches are invalidated.
+    versions_dir = Path(os.environ.get("AI_INDEX_VERSIONS_DIR") or repo_root / "evidence/ai/indexing-versions")
+    if not versions_dir.is_absolute():
+        versions_dir = repo_root / versions_dir
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    (versions_dir / f"{collection}.json").write_text(
+        json.dumps({
+            "collection": collection,
+            "source_type": source_type,
+            "commit_sha": commit_sha,
+            "timestamp_utc": timestamp,
+            "points": len(points),
+        }, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
 
 if denied_found:
     raise SystemExit("ERROR: redaction deny patterns matched; indexing aborted")
@@ -70,8 +70,25 @@ elif kind == "observability":
         for item in queries:
             if not isinstance(item, dict) or "name" not in item or "expr" not in item:
                 raise SystemExit(f"ERROR: {section_name}.queries entries must include name/expr")
+    limits = payload.get("limits", {})
+    if not isinstance(limits, dict):
+        raise SystemExit("ERROR: limits must be a mapping")
+    for field in ("max_stream_lines", "max_stream_seconds"):
+        value = limits.get(field, 1)
+        if not isinstance(value, int) or value < 1:
+            raise SystemExit(f"ERROR: limits.{field} must be a positive integer")
 elif kind == "qdrant":
     ensure_base_url(payload.get("base_url"), "base_url")
+    cache = payload.get("cache", {})
+    if not isinstance(cache, dict):
+        raise SystemExit("ERROR: cache must be a mapping")
+    for field in ("max_entries_per_tenant", "ttl_seconds", "max_tenants"):
+        value = cache.get(field, 1)
+        if not isinstance(value, int) or value < 1:
+            raise SystemExit(f"ERROR: cache.{field} must be a positive integer")
+    threshold = cache.get("similarity_threshold", 0)
+    if not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+        raise SystemExit("ERROR: cache.similarity_threshold must be between 0 and 1")
 else:
     raise SystemExit(f"ERROR: unknown MCP allowlist kind: {kind}")
 
@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
+import cProfile
+import hashlib
+import heapq
 import json
+import math
+import mmap
+import operator
 import os
+import pstats
+import random
 import re
+import socket
 import subprocess
+import sys
 import time
 import uuid
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from io import StringIO
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
+from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
@@ -17,6 +32,16 @@ except Exception as exc:  # pragma: no cover - hard failure
 
 MAX_BODY_BYTES = 1024 * 1024
 MAX_CONTENT_BYTES = 200000
+MAX_DOWNSAMPLE_POINTS = 11000
+MAX_LOKI_PAGE_LIMIT = 5000
+MAX_DEDUP_WINDOW = 10000
+MAX_LINE_PATTERNS = 1000
+STREAM_SEND_TIMEOUT_SECONDS = 10
+COLLECTION_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+PATTERN_TOKEN_RE = re.compile(
+    r"\b(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|0x[0-9a-fA-F]+|[0-9a-fA-F]{12,})\b|\d+(?:[.:]\d+)*"
+)
 
 
 def utc_stamp():
@@ -83,11 +108,13 @@ def path_allowed(relpath: str, roots, files):
     return False
 
 
-def read_text_file(path: Path, redaction_patterns):
-    data = path.read_text(encoding="utf-8", errors="ignore")
-    for pattern in redaction_patterns:
-        if re.search(pattern, data):
-            return None, True, False
+def read_text_file(path: Path, redaction_patterns, timer=None):
+    with timer.span("read") if timer else nullcontext():
+        data = path.read_text(encoding="utf-8", errors="ignore")
+    with timer.span("redact") if timer else nullcontext():
+        for pattern in redaction_patterns:
+            if re.search(pattern, data):
+                return None, True, False
     truncated = len(data.encode("utf-8")) > MAX_CONTENT_BYTES
     if truncated:
         data = data.encode("utf-8")[:MAX_CONTENT_BYTES].decode("utf-8", errors="ignore")
@@ -113,7 +140,7 @@ def list_files(root: Path, max_items: int = 500):
     return items
 
 
-def write_audit(repo_root: Path, request_meta, decision, response_meta):
+def write_audit(repo_root: Path, request_meta, decision, response_meta, profile=None):
     audit_root = repo_root / "evidence" / "ai" / "mcp-audit"
     audit_root.mkdir(parents=True, exist_ok=True)
     audit_dir = audit_root / f"{utc_stamp()}-{uuid.uuid4().hex[:8]}"
@@ -131,6 +158,11 @@ def write_audit(repo_root: Path, request_meta, decision, response_meta):
         json.dumps(response_meta, indent=2, sort_keys=True) + "\n",
         encoding="utf-8",
     )
+    if profile is not None:
+        profile.dump_stats(str(audit_dir / "profile.pstats"))
+        report = StringIO()
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(40)
+        (audit_dir / "profile.txt").write_text(report.getvalue(), encoding="utf-8")
 
     manifest_script = repo_root / "ops" / "ai" / "indexer" / "lib" / "manifest.sh"
     if manifest_script.exists():
@@ -156,14 +188,438 @@ def prometheus_query(base_url, query, start, end, step):
         return json.loads(resp.read().decode("utf-8"))
 
 
-def loki_query(base_url, query, start, end, limit):
-    params = {"query": query, "start": start, "end": end, "limit": limit}
+def loki_query(base_url, query, start, end, limit, direction="backward"):
+    params = {"query": query, "start": start, "end": end, "limit": limit, "direction": direction}
     url = f"{base_url}/loki/api/v1/query_range?{urlencode(params)}"
     req = Request(url, method="GET")
     with urlopen(req, timeout=10) as resp:
         return json.loads(resp.read().decode("utf-8"))
 
 
+def matrix_points(values):
+    points = []
+    for item in values:
+        try:
+            ts = float(item[0])
+            value = float(item[1])
+        except (TypeError, ValueError, IndexError):
+            continue
+        if math.isfinite(value):
+            points.append((ts, value, item))
+    return points
+
+
+def lttb_indices(points, threshold):
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_bucket = points[end:next_end]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+        anchor_x, anchor_y = points[anchor][0], points[anchor][1]
+        best, best_area = start, -1.0
+        for idx in range(start, end):
+            x, y = points[idx][0], points[idx][1]
+            area = abs((anchor_x - avg_x) * (y - anchor_y) - (anchor_x - x) * (avg_y - anchor_y))
+            if area > best_area:
+                best, best_area = idx, area
+        selected.append(best)
+        anchor = best
+    selected.append(count - 1)
+    return selected
+
+
+def series_summary(points):
+    if not points:
+        return {"count": 0}
+    ordered = sorted(p[1] for p in points)
+    rank = max(1, math.ceil(0.95 * len(ordered)))
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "avg": sum(ordered) / len(ordered),
+        "p95": ordered[rank - 1],
+        "last": points[-1][1],
+    }
+
+
+def reduce_prometheus_matrix(payload, max_points, summary, summary_only):
+    data = payload.get("data") if isinstance(payload, dict) else None
+    if not isinstance(data, dict) or data.get("resultType") != "matrix":
+        return payload
+    reduced = []
+    for series in data.get("result", []):
+        values = series.get("values", [])
+        points = matrix_points(values)
+        item = {"metric": series.get("metric", {})}
+        if summary or summary_only:
+            item["summary"] = series_summary(points)
+        if not summary_only:
+            if max_points:
+                item["values"] = [points[idx][2] for idx in lttb_indices(points, max_points)]
+            else:
+                item["values"] = values
+        reduced.append(item)
+    data["result"] = reduced
+    payload["reduction"] = {
+        "method": "lttb" if max_points and not summary_only else "none",
+        "max_points": max_points,
+        "summary": bool(summary or summary_only),
+        "summary_only": summary_only,
+    }
+    return payload
+
+
+class RequestTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = {}
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def timings(self):
+        timings = {name: round(value, 3) for name, value in self.spans.items()}
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        return timings
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={value}" for name, value in self.timings().items())
+
+
+class NDJSONStream:
+    def __init__(self, records, meta):
+        self.records = records
+        self.meta = meta
+
+
+def loki_page_entries(payload, direction):
+    data = payload.get("data", {}) if isinstance(payload, dict) else {}
+    entries = []
+    for stream in data.get("result", []) or []:
+        labels = stream.get("stream", {})
+        for item in stream.get("values", []) or []:
+            try:
+                entries.append((int(item[0]), labels, str(item[1])))
+            except (TypeError, ValueError, IndexError):
+                continue
+    entries.sort(key=lambda entry: entry[0], reverse=direction == "backward")
+    return entries
+
+
+def fixture_loki_page(fixture, start_ns, end_ns, limit, direction):
+    entries = [
+        entry for entry in loki_page_entries(fixture, direction) if start_ns <= entry[0] < end_ns
+    ][:limit]
+    return {
+        "status": "success",
+        "data": {
+            "resultType": "streams",
+            "result": [{"stream": labels, "values": [[str(ts), line]]} for ts, labels, line in entries],
+        },
+    }
+
+
+def line_pattern(line):
+    return PATTERN_TOKEN_RE.sub("<*>", line)[:200]
+
+
+def loki_stream_records(fetch_page, start_ns, end_ns, direction, page_limit, max_lines, deadline, dedup, patterns, meta):
+    seen = OrderedDict()
+    counts = {}
+    boundary_ts, boundary_keys = None, set()
+    meta.update(
+        {
+            "pages": 0,
+            "lines": 0,
+            "duplicates": 0,
+            "truncated": False,
+            "truncated_reason": None,
+            "boundary_overflow": False,
+        }
+    )
+
+    def truncate(reason):
+        meta["truncated"] = True
+        meta["truncated_reason"] = reason
+
+    def fetch(page_start, page_end, page_size):
+        # The stream holds the only request thread, so the walk is bounded in
+        # wall-clock time as well as in lines.
+        if time.monotonic() >= deadline:
+            truncate("max_stream_seconds")
+            return None
+        meta["pages"] += 1
+        return loki_page_entries(fetch_page(page_start, page_end, page_size, direction), direction)
+
+    def emit(entries):
+        fresh = 0
+        for ts, labels, line in entries:
+            if ts == boundary_ts and (tuple(sorted(labels.items())), line) in boundary_keys:
+                continue
+            if meta["lines"] >= max_lines:
+                truncate("max_stream_lines")
+                break
+            fresh += 1
+            if dedup:
+                key = hash((ts, line))
+                if key in seen:
+                    meta["duplicates"] += 1
+                    continue
+                seen[key] = None
+                if len(seen) > MAX_DEDUP_WINDOW:
+                    seen.popitem(last=False)
+            if patterns:
+                pattern = line_pattern(line)
+                if pattern in counts or len(counts) < MAX_LINE_PATTERNS:
+                    counts[pattern] = counts.get(pattern, 0) + 1
+                else:
+                    meta["patterns_overflow"] = meta.get("patterns_overflow", 0) + 1
+            meta["lines"] += 1
+            yield {"type": "line", "ts": str(ts), "labels": labels, "line": line}
+        return fresh
+
+    while start_ns < end_ns:
+        entries = fetch(start_ns, end_ns, page_limit)
+        if entries is None:
+            break
+        fresh = yield from emit(entries)
+        if meta["truncated"] or len(entries) < page_limit:
+            break
+        # Pages overlap on the last timestamp so entries sharing it are not lost.
+        last_ts = entries[-1][0]
+        if last_ts != boundary_ts:
+            boundary_ts, boundary_keys = last_ts, set()
+        boundary_keys.update(
+            (tuple(sorted(labels.items())), line) for ts, labels, line in entries if ts == last_ts
+        )
+        if not fresh:
+            # A full page with nothing new: more entries share last_ts than fit in
+            # a page. Fetch that timestamp alone at the maximum page size, and flag
+            # the stream if even that page is full.
+            overflow = fetch(last_ts, last_ts + 1, MAX_LOKI_PAGE_LIMIT)
+            if overflow is None:
+                break
+            yield from emit(overflow)
+            if len(overflow) >= MAX_LOKI_PAGE_LIMIT:
+                meta["boundary_overflow"] = True
+            if meta["truncated"]:
+                break
+        if direction == "forward":
+            start_ns = last_ts if fresh else last_ts + 1
+            cursor = start_ns
+        else:
+            end_ns = last_ts + 1 if fresh else last_ts
+            cursor = end_ns
+        yield {"type": "page", "page": meta["pages"], "cursor": str(cursor)}
+    summary = {
+        "type": "summary",
+        "pages": meta["pages"],
+        "lines": meta["lines"],
+        "truncated": meta["truncated"],
+        "truncated_reason": meta["truncated_reason"],
+        "boundary_overflow": meta["boundary_overflow"],
+    }
+    if dedup:
+        summary["duplicates"] = meta["duplicates"]
+    if patterns:
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:50]
+        summary["patterns"] = [{"pattern": pattern, "count": count} for pattern, count in top]
+        summary["patterns_overflow"] = meta.get("patterns_overflow", 0)
+    yield summary
+
+
+class LocalCollection:
+    """In-process stand-in for a Qdrant collection.
+
+    A collection directory holds `collection.json` (`dim`, `distance`), a
+    row-major little-endian float32 matrix in `vectors.f32`, and one
+    `{"id": ..., "payload": {...}}` line per row in `payloads.jsonl`.
+    """
+
+    def __init__(self, path: Path):
+        meta = json.loads((path / "collection.json").read_text(encoding="utf-8"))
+        self.dim = int(meta["dim"])
+        self.distance = meta.get("distance", "cosine")
+        if self.dim <= 0 or self.distance not in {"cosine", "dot"}:
+            raise ValueError(f"invalid local collection metadata: {path}")
+
+        with (path / "vectors.f32").open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                vectors = memoryview(self._mmap).cast("f")
+            else:
+                vectors = memoryview(b"").cast("f")
+        if sys.byteorder != "little":
+            swapped = array("f", vectors.tobytes())
+            swapped.byteswap()
+            vectors = memoryview(swapped)
+        if len(vectors) % self.dim:
+            raise ValueError(f"vectors.f32 does not match dim {self.dim}: {path}")
+        self.vectors = vectors
+        self.count = len(vectors) // self.dim
+
+        with (path / "payloads.jsonl").open("r", encoding="utf-8") as handle:
+            self.points = [json.loads(line) for line in handle if line.strip()]
+        if len(self.points) != self.count:
+            raise ValueError(f"payloads.jsonl does not match vectors.f32: {path}")
+        self.source_types = [point.get("payload", {}).get("source_type") for point in self.points]
+        self.norms = []
+        if self.distance == "cosine":
+            self.norms = [math.sqrt(sum(v * v for v in self._row(idx))) for idx in range(self.count)]
+
+    def _row(self, idx):
+        return self.vectors[idx * self.dim:(idx + 1) * self.dim]
+
+    def search(self, query, top_k, source_type=None):
+        if len(query) != self.dim:
+            raise ValueError("vector_dim_mismatch")
+        started = time.perf_counter()
+        query_norm = math.sqrt(sum(v * v for v in query)) if self.distance == "cosine" else 1.0
+
+        def scored():
+            for idx in range(self.count):
+                if source_type and self.source_types[idx] != source_type:
+                    continue
+                score = sum(map(operator.mul, self._row(idx), query))
+                if self.distance == "cosine":
+                    denom = self.norms[idx] * query_norm
+                    score = score / denom if denom else 0.0
+                yield score, idx
+
+        top = heapq.nlargest(top_k, scored(), key=lambda item: item[0])
+        return {
+            "result": [
+                {"id": self.points[idx].get("id"), "score": score, "payload": self.points[idx].get("payload", {})}
+                for score, idx in top
+            ],
+            "status": "ok",
+            "time": time.perf_counter() - started,
+        }
+
+
+class SearchCache:
+    """Tenant-scoped cache of search results keyed by a quantized query vector.
+
+    Each tenant bucket is tied to a collection version; a version change drops
+    the bucket. Buckets are only created on store and at most `max_tenants`
+    are kept (least recently used first out), since tenant names come from an
+    unvalidated header. With `similarity_threshold` > 0, a miss on the exact key falls
+    back to the closest cached query (cosine) with the same `top_k` and
+    `source_type`.
+    """
+
+    QUANTUM = 1e-4
+
+    def __init__(self, max_entries, ttl_seconds, similarity_threshold, max_tenants):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_tenants = max_tenants
+        self.tenants = OrderedDict()
+        self.stats = {"hit": 0, "similar_hit": 0, "miss": 0, "invalidations": 0}
+
+    def _key(self, vector, top_k, source_type):
+        quantized = ",".join(str(round(v / self.QUANTUM)) for v in vector)
+        return hashlib.sha256(f"{top_k}|{source_type or ''}|{quantized}".encode("utf-8")).hexdigest()
+
+    def _bucket(self, tenant, version):
+        # Returns the tenant's live entries without creating a bucket; a stale
+        # version or a bucket left empty by TTL expiry is dropped.
+        bucket = self.tenants.get(tenant)
+        if bucket is None:
+            return None
+        if bucket["version"] != version:
+            del self.tenants[tenant]
+            self.stats["invalidations"] += 1
+            return None
+        entries = bucket["entries"]
+        now = time.monotonic()
+        for key in [key for key, entry in entries.items() if now - entry["stored_at"] > self.ttl_seconds]:
+            del entries[key]
+        if not entries:
+            del self.tenants[tenant]
+            return None
+        self.tenants.move_to_end(tenant)
+        return entries
+
+    def lookup(self, tenant, version, vector, top_k, source_type):
+        entries = self._bucket(tenant, version)
+        if entries is None:
+            self.stats["miss"] += 1
+            return None, None
+        key = self._key(vector, top_k, source_type)
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            self.stats["hit"] += 1
+            return "hit", json.loads(entry["result"])
+        if self.similarity_threshold > 0:
+            unit = unit_vector(vector)
+            best, best_score = None, self.similarity_threshold
+            for candidate in entries.values():
+                if candidate["top_k"] != top_k or candidate["source_type"] != source_type:
+                    continue
+                if len(candidate["unit"]) != len(unit):
+                    continue
+                score = sum(map(operator.mul, candidate["unit"], unit))
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                self.stats["similar_hit"] += 1
+                return "similar_hit", json.loads(best["result"])
+        self.stats["miss"] += 1
+        return None, None
+
+    def store(self, tenant, version, vector, top_k, source_type, result):
+        entries = self._bucket(tenant, version)
+        if entries is None:
+            entries = OrderedDict()
+            self.tenants[tenant] = {"version": version, "entries": entries}
+            while len(self.tenants) > self.max_tenants:
+                self.tenants.popitem(last=False)
+        entries[self._key(vector, top_k, source_type)] = {
+            "stored_at": time.monotonic(),
+            "top_k": top_k,
+            "source_type": source_type,
+            "unit": unit_vector(vector) if self.similarity_threshold > 0 else [],
+            "result": json.dumps(result),
+        }
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def metrics_lines(self, mcp_kind):
+        entries = sum(len(bucket["entries"]) for bucket in self.tenants.values())
+        lines = ["# TYPE mcp_search_cache_requests_total counter"]
+        for result in ("hit", "similar_hit", "miss"):
+            lines.append(f'mcp_search_cache_requests_total{{mcp="{mcp_kind}",result="{result}"}} {self.stats[result]}')
+        lines.extend([
+            "# TYPE mcp_search_cache_invalidations_total counter",
+            f'mcp_search_cache_invalidations_total{{mcp="{mcp_kind}"}} {self.stats["invalidations"]}',
+            "# TYPE mcp_search_cache_entries gauge",
+            f'mcp_search_cache_entries{{mcp="{mcp_kind}"}} {entries}',
+        ])
+        return lines
+
+
+def unit_vector(vector):
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else [0.0 for _ in vector]
+
+
 class MCPHandler(BaseHTTPRequestHandler):
     server_version = "MCPReadOnly/1.0"
 
@@ -171,6 +627,14 @@ class MCPHandler(BaseHTTPRequestHandler):
         return
 
     def do_GET(self):
+        if self.path == "/metrics":
+            data = ("\n".join(self.server.metrics_lines()) + "\n").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
         if self.path != "/healthz":
             self.send_error(404)
             return
@@ -187,13 +651,28 @@ class MCPHandler(BaseHTTPRequestHandler):
             self.send_error(413, "payload too large")
             return
 
-        raw_body = self.rfile.read(content_length).decode("utf-8", errors="ignore")
-        try:
-            body = json.loads(raw_body) if raw_body else {}
-        except json.JSONDecodeError:
+        timer = RequestTimer()
+        with timer.span("parse"):
+            raw_body = self.rfile.read(content_length).decode("utf-8", errors="ignore")
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+            except json.JSONDecodeError:
+                body = None
+        if not isinstance(body, dict):
             self.send_error(400, "invalid json")
             return
 
+        profile = cProfile.Profile() if random.random() < self.server.profile_sample_rate() else None
+        if profile is not None:
+            profile.enable()
+        try:
+            self._handle_query(body, timer, profile)
+        finally:
+            # A profiler left enabled breaks every later sampled request.
+            if profile is not None:
+                profile.disable()
+
+    def _handle_query(self, body, timer, profile):
         identity = self.headers.get(self.server.identity_header, "").strip()
         tenant = self.headers.get(self.server.tenant_header, "").strip()
         request_id = self.headers.get(self.server.request_id_header, "").strip()
@@ -207,41 +686,110 @@ class MCPHandler(BaseHTTPRequestHandler):
 
         try:
             response_payload, decision, status_code = self.server.handle_action(
-                identity, tenant, action, params
+                identity, tenant, action, params, timer
             )
         except Exception as exc:
             decision = {"allowed": False, "reason": f"exception:{exc}"}
             status_code = 500
             response_payload = {"ok": False, "error": "internal_error"}
 
-        response_bytes = len(json.dumps(response_payload).encode("utf-8"))
-        response_meta = {
-            "status": status_code,
-            "bytes": response_bytes,
-            "request_id": request_id,
-            "action": action,
-        }
-
-        request_meta = {
-            "mcp": self.server.mcp_kind,
-            "identity": identity,
-            "tenant": tenant,
-            "action": action,
-            "params": sanitize_params(params),
-            "request_id": request_id,
-        }
-
-        write_audit(self.server.repo_root, request_meta, decision, response_meta)
-        self._send_json(status_code, response_payload)
-
-    def _send_json(self, status, payload):
-        data = json.dumps(payload).encode("utf-8")
+        streamed = isinstance(response_payload, NDJSONStream)
+        response_bytes = 0
+        try:
+            if streamed:
+                with timer.span("stream"):
+                    response_bytes = self._send_ndjson(status_code, response_payload, timer.server_timing())
+            else:
+                with timer.span("serialize"):
+                    data = json.dumps(response_payload).encode("utf-8")
+                response_bytes = len(data)
+        finally:
+            # Every request is audited, even if streaming or serialization fails.
+            if profile is not None:
+                profile.disable()
+            response_meta = {
+                "status": status_code,
+                "bytes": response_bytes,
+                "request_id": request_id,
+                "action": action,
+                "timings_ms": timer.timings(),
+                "profiled": profile is not None,
+            }
+            if streamed:
+                response_meta["stream"] = response_payload.meta
+
+            request_meta = {
+                "mcp": self.server.mcp_kind,
+                "identity": identity,
+                "tenant": tenant,
+                "action": action,
+                "params": sanitize_params(params),
+                "request_id": request_id,
+            }
+
+            with timer.span("audit"):
+                write_audit(self.server.repo_root, request_meta, decision, response_meta, profile)
+        if not streamed:
+            self._send_json(status_code, response_payload, data, timer.server_timing())
+
+    def _send_json(self, status, payload, data=None, server_timing=None):
+        if data is None:
+            data = json.dumps(payload).encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(data)))
+        if server_timing:
+            self.send_header("Server-Timing", server_timing)
         self.end_headers()
         self.wfile.write(data)
 
+    def _send_ndjson(self, status, stream, server_timing=None):
+        # Chunked transfer encoding requires HTTP/1.1; HTTP/1.0 clients get a
+        # close-delimited body instead. The connection is closed afterwards.
+        chunked = self.request_version != "HTTP/1.0"
+        # A client that stops reading must not hold the request thread forever;
+        # a stalled send is treated like a disconnect.
+        self.connection.settimeout(STREAM_SEND_TIMEOUT_SECONDS)
+        if chunked:
+            self.protocol_version = "HTTP/1.1"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        if server_timing:
+            self.send_header("Server-Timing", server_timing)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        total = 0
+        records = iter(stream.records)
+        try:
+            while True:
+                try:
+                    record = next(records)
+                except StopIteration:
+                    break
+                except Exception as exc:
+                    stream.meta["error"] = f"exception:{exc}"
+                    record = {"type": "error", "error": "stream_failed"}
+                    total += self._write_record(record, chunked)
+                    break
+                total += self._write_record(record, chunked)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError, socket.timeout) as exc:
+            stream.meta["error"] = f"client_disconnected:{exc.__class__.__name__}"
+            if hasattr(records, "close"):
+                records.close()
+        return total
+
+    def _write_record(self, record, chunked):
+        data = (json.dumps(record) + "\n").encode("utf-8")
+        if chunked:
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        else:
+            self.wfile.write(data)
+        return len(data)
+
 
 class MCPServer(HTTPServer):
     def __init__(self, server_address, handler_class):
@@ -254,18 +802,89 @@ class MCPServer(HTTPServer):
         self.identity_header = os.environ.get("MCP_IDENTITY_HEADER", "X-MCP-Identity")
         self.tenant_header = os.environ.get("MCP_TENANT_HEADER", "X-MCP-Tenant")
         self.request_id_header = os.environ.get("MCP_REQUEST_ID_HEADER", "X-MCP-Request-Id")
-        runner_mode = os.environ.get("RUNNER_MODE") or "ci"
+        self.runner_mode = os.environ.get("RUNNER_MODE") or "ci"
         self.test_mode = (
             os.environ.get("MCP_TEST_MODE", "0") == "1"
             or os.environ.get("CI", "0") == "1"
-            or runner_mode == "ci"
+            or self.runner_mode == "ci"
         )
+        profile_control = os.environ.get("MCP_PROFILE_CONTROL", "")
+        self.profile_control = Path(profile_control) if profile_control else None
+        self.profile_state = (None, 0.0)
         self.redaction_patterns = load_redaction_patterns(
             self.repo_root / "contracts" / "ai" / "indexing.yml"
         )
         self.allowlist = load_allowlist(self.allowlist_path)
+        local_dir = os.environ.get("QDRANT_LOCAL_DIR", "")
+        if not local_dir and self.test_mode:
+            local_dir = str(self.repo_root / "ops" / "ai" / "mcp" / "qdrant" / "fixtures" / "local")
+        self.qdrant_local_dir = (self.repo_root / local_dir).resolve() if local_dir else None
+        self.local_collections = {}
+        versions_dir = os.environ.get("AI_INDEX_VERSIONS_DIR", "")
+        self.index_versions_dir = (
+            (self.repo_root / versions_dir).resolve()
+            if versions_dir
+            else self.repo_root / "evidence" / "ai" / "indexing-versions"
+        )
+        cache_cfg = self.allowlist.get("cache", {}) if self.mcp_kind == "qdrant" else {}
+        self.search_cache = None
+        if isinstance(cache_cfg, dict) and cache_cfg.get("enabled"):
+            self.search_cache = SearchCache(
+                int(cache_cfg.get("max_entries_per_tenant", 256)),
+                int(cache_cfg.get("ttl_seconds", 300)),
+                float(cache_cfg.get("similarity_threshold", 0) or 0),
+                int(cache_cfg.get("max_tenants", 64)),
+            )
+
+    def profile_sample_rate(self):
+        # Operator-only; the control file is re-read when it changes so sampling
+        # can be adjusted without restarting the service.
+        if self.runner_mode != "operator" or self.profile_control is None:
+            return 0.0
+        try:
+            mtime = self.profile_control.stat().st_mtime_ns
+        except OSError:
+            return 0.0
+        if mtime != self.profile_state[0]:
+            try:
+                payload = json.loads(self.profile_control.read_text(encoding="utf-8"))
+                rate = float(payload.get("sample_rate", 0))
+            except (OSError, ValueError, TypeError, AttributeError):
+                rate = 0.0
+            self.profile_state = (mtime, min(max(rate, 0.0), 1.0))
+        return self.profile_state[1]
+
+    def metrics_lines(self):
+        lines = ["# TYPE mcp_up gauge", f'mcp_up{{mcp="{self.mcp_kind}"}} 1']
+        if self.search_cache is not None:
+            lines.extend(self.search_cache.metrics_lines(self.mcp_kind))
+        return lines
+
+    def handle_action(self, identity, tenant, action, params, timer=None):
+        timer = timer or RequestTimer()
+        with timer.span("auth"):
+            denied = self._authorize(identity, tenant, action)
+        if denied is not None:
+            return denied
+
+        if self.mcp_kind == "repo":
+            return self._handle_repo(action, params, timer)
+        if self.mcp_kind == "evidence":
+            return self._handle_evidence(action, tenant, params, timer)
+        if self.mcp_kind == "observability":
+            return self._handle_observability(action, params, timer)
+        if self.mcp_kind == "runbooks":
+            return self._handle_runbooks(action, params, timer)
+        if self.mcp_kind == "qdrant":
+            return self._handle_qdrant(action, tenant, params, timer)
 
-    def handle_action(self, identity, tenant, action, params):
+        return (
+            {"ok": False, "error": "unknown_mcp"},
+            {"allowed": False, "reason": "unknown_mcp"},
+            500,
+        )
+
+    def _authorize(self, identity, tenant, action):
         if action not in self.allowed_actions:
             return (
                 {"ok": False, "error": "action_not_allowed"},
@@ -294,54 +913,43 @@ class MCPServer(HTTPServer):
                 403,
             )
 
-        if self.mcp_kind == "repo":
-            return self._handle_repo(action, params)
-        if self.mcp_kind == "evidence":
-            return self._handle_evidence(action, tenant, params)
-        if self.mcp_kind == "observability":
-            return self._handle_observability(action, params)
-        if self.mcp_kind == "runbooks":
-            return self._handle_runbooks(action, params)
-        if self.mcp_kind == "qdrant":
-            return self._handle_qdrant(action, tenant, params)
-
-        return (
-            {"ok": False, "error": "unknown_mcp"},
-            {"allowed": False, "reason": "unknown_mcp"},
-            500,
-        )
+        return None
 
-    def _handle_repo(self, action, params):
+    def _handle_repo(self, action, params, timer):
         roots = self.allowlist.get("roots", [])
         files = self.allowlist.get("files", [])
 
         if action == "list_files":
             target = params.get("path")
             if target:
-                if not path_allowed(target, roots, files):
-                    return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
-                root_path = (self.repo_root / normalize_relpath(target)).resolve()
-                if not is_relative_to(root_path, self.repo_root):
-                    return ({"ok": False, "error": "invalid_path"}, {"allowed": False, "reason": "invalid_path"}, 400)
-                items = list_files(root_path)
+                with timer.span("path"):
+                    if not path_allowed(target, roots, files):
+                        return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
+                    root_path = (self.repo_root / normalize_relpath(target)).resolve()
+                    if not is_relative_to(root_path, self.repo_root):
+                        return ({"ok": False, "error": "invalid_path"}, {"allowed": False, "reason": "invalid_path"}, 400)
+                with timer.span("list"):
+                    items = list_files(root_path)
             else:
                 items = []
-                for root in roots:
-                    root_prefix = normalize_relpath(root)
-                    root_path = (self.repo_root / root_prefix).resolve()
-                    if root_path.exists():
-                        items.extend([f"{root_prefix}/{item}" for item in list_files(root_path)])
+                with timer.span("list"):
+                    for root in roots:
+                        root_prefix = normalize_relpath(root)
+                        root_path = (self.repo_root / root_prefix).resolve()
+                        if root_path.exists():
+                            items.extend([f"{root_prefix}/{item}" for item in list_files(root_path)])
                 items.extend(files)
             return ({"ok": True, "data": {"files": items}}, {"allowed": True, "reason": "ok"}, 200)
 
         if action == "read_file":
             target = params.get("path", "")
-            if not target or not path_allowed(target, roots, files):
-                return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
-            file_path = (self.repo_root / normalize_relpath(target)).resolve()
-            if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
-                return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
-            content, denied, truncated = read_text_file(file_path, self.redaction_patterns)
+            with timer.span("path"):
+                if not target or not path_allowed(target, roots, files):
+                    return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
+                file_path = (self.repo_root / normalize_relpath(target)).resolve()
+                if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
+                    return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
+            content, denied, truncated = read_text_file(file_path, self.redaction_patterns, timer)
             if denied:
                 return ({"ok": False, "error": "redacted"}, {"allowed": False, "reason": "redacted"}, 403)
             if content is None:
@@ -363,7 +971,8 @@ class MCPServer(HTTPServer):
             args = ["git", "diff", "--no-color", base, target]
             if relpath:
                 args.extend(["--", relpath])
-            result = subprocess.run(args, cwd=self.repo_root, capture_output=True, text=True, check=False)
+            with timer.span("git"):
+                result = subprocess.run(args, cwd=self.repo_root, capture_output=True, text=True, check=False)
             output = result.stdout[:MAX_CONTENT_BYTES]
             return (
                 {"ok": True, "data": {"diff": output, "truncated": len(result.stdout) > MAX_CONTENT_BYTES}},
@@ -380,7 +989,8 @@ class MCPServer(HTTPServer):
             args = ["git", "log", f"-n{limit}", "--pretty=format:%H|%s|%ad", "--date=iso"]
             if relpath:
                 args.extend(["--", relpath])
-            result = subprocess.run(args, cwd=self.repo_root, capture_output=True, text=True, check=False)
+            with timer.span("git"):
+                result = subprocess.run(args, cwd=self.repo_root, capture_output=True, text=True, check=False)
             entries = []
             for line in result.stdout.splitlines():
                 parts = line.split("|", 2)
@@ -390,38 +1000,41 @@ class MCPServer(HTTPServer):
 
         return ({"ok": False, "error": "unknown_action"}, {"allowed": False, "reason": "unknown_action"}, 400)
 
-    def _handle_evidence(self, action, tenant, params):
+    def _handle_evidence(self, action, tenant, params, timer):
         roots = self.allowlist.get("roots", [])
         if action == "list_evidence":
             base = params.get("path", "evidence")
-            if not path_allowed(base, roots, []):
-                return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
-            root_path = (self.repo_root / normalize_relpath(base)).resolve()
-            if not root_path.exists() or not is_relative_to(root_path, self.repo_root):
-                return ({"ok": False, "error": "not_found"}, {"allowed": False, "reason": "not_found"}, 404)
+            with timer.span("path"):
+                if not path_allowed(base, roots, []):
+                    return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
+                root_path = (self.repo_root / normalize_relpath(base)).resolve()
+                if not root_path.exists() or not is_relative_to(root_path, self.repo_root):
+                    return ({"ok": False, "error": "not_found"}, {"allowed": False, "reason": "not_found"}, 404)
             items = []
-            for path in root_path.rglob("*"):
-                if path.is_dir():
-                    rel = path.relative_to(self.repo_root).as_posix()
-                    if f"/{tenant}/" in f"/{rel}/":
-                        items.append(rel)
-                        if len(items) >= 200:
-                            break
+            with timer.span("list"):
+                for path in root_path.rglob("*"):
+                    if path.is_dir():
+                        rel = path.relative_to(self.repo_root).as_posix()
+                        if f"/{tenant}/" in f"/{rel}/":
+                            items.append(rel)
+                            if len(items) >= 200:
+                                break
             return ({"ok": True, "data": {"directories": items}}, {"allowed": True, "reason": "ok"}, 200)
 
         if action == "read_file":
             target = params.get("path", "")
             if not target:
                 return ({"ok": False, "error": "path_required"}, {"allowed": False, "reason": "path_required"}, 400)
-            if not path_allowed(target, roots, []):
-                return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
-            rel = normalize_relpath(target)
-            if f"/{tenant}/" not in f"/{rel}/":
-                return ({"ok": False, "error": "tenant_isolation"}, {"allowed": False, "reason": "tenant_isolation"}, 403)
-            file_path = (self.repo_root / rel).resolve()
-            if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
-                return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
-            content, denied, _ = read_text_file(file_path, self.redaction_patterns)
+            with timer.span("path"):
+                if not path_allowed(target, roots, []):
+                    return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
+                rel = normalize_relpath(target)
+                if f"/{tenant}/" not in f"/{rel}/":
+                    return ({"ok": False, "error": "tenant_isolation"}, {"allowed": False, "reason": "tenant_isolation"}, 403)
+                file_path = (self.repo_root / rel).resolve()
+                if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
+                    return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
+            content, denied, _ = read_text_file(file_path, self.redaction_patterns, timer)
             if denied:
                 return ({"ok": False, "error": "redacted"}, {"allowed": False, "reason": "redacted"}, 403)
             return (
@@ -432,12 +1045,14 @@ class MCPServer(HTTPServer):
 
         return ({"ok": False, "error": "unknown_action"}, {"allowed": False, "reason": "unknown_action"}, 400)
 
-    def _handle_observability(self, action, params):
+    def _handle_observability(self, action, params, timer):
         prom = self.allowlist.get("prometheus", {})
         loki = self.allowlist.get("loki", {})
         limits = self.allowlist.get("limits", {})
         max_range = int(limits.get("max_range_seconds", 3600))
         max_step = int(limits.get("max_step_seconds", 300))
+        max_stream_lines = int(limits.get("max_stream_lines", 50000))
+        max_stream_seconds = int(limits.get("max_stream_seconds", 30))
 
         if action == "query_prometheus":
             query_name = params.get("query_name")
@@ -446,6 +1061,12 @@ class MCPServer(HTTPServer):
             step = int(params.get("step", 60))
             if end <= start or (end - start) > max_range or step > max_step:
                 return ({"ok": False, "error": "range_invalid"}, {"allowed": False, "reason": "range_invalid"}, 400)
+            max_points = int(params.get("max_points", 0))
+            summary = params.get("summary") is True
+            summary_only = params.get("summary_only") is True
+            if max_points and not 3 <= max_points <= MAX_DOWNSAMPLE_POINTS:
+                return ({"ok": False, "error": "reduction_invalid"}, {"allowed": False, "reason": "reduction_invalid"}, 400)
+            reduce_result = bool(max_points or summary or summary_only)
             expr = None
             for item in prom.get("queries", []):
                 if item.get("name") == query_name:
@@ -454,12 +1075,20 @@ class MCPServer(HTTPServer):
             if not expr:
                 return ({"ok": False, "error": "query_not_allowed"}, {"allowed": False, "reason": "query_not_allowed"}, 403)
             if self.test_mode:
-                fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "observability" / "fixtures" / "prometheus.json")
+                with timer.span("fixture"):
+                    fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "observability" / "fixtures" / "prometheus.json")
+                if reduce_result:
+                    with timer.span("reduce"):
+                        fixture = reduce_prometheus_matrix(fixture, max_points, summary, summary_only)
                 fixture["source"] = "fixture"
                 return ({"ok": True, "data": fixture}, {"allowed": True, "reason": "fixture"}, 200)
             if os.environ.get("OBS_LIVE") != "1":
                 return ({"ok": False, "error": "live_disabled"}, {"allowed": False, "reason": "live_disabled"}, 403)
-            data = prometheus_query(prom.get("base_url"), expr, start, end, step)
+            with timer.span("upstream"):
+                data = prometheus_query(prom.get("base_url"), expr, start, end, step)
+            if reduce_result:
+                with timer.span("reduce"):
+                    data = reduce_prometheus_matrix(data, max_points, summary, summary_only)
             return ({"ok": True, "data": data}, {"allowed": True, "reason": "live"}, 200)
 
         if action == "query_loki":
@@ -476,36 +1105,82 @@ class MCPServer(HTTPServer):
                     break
             if not expr:
                 return ({"ok": False, "error": "query_not_allowed"}, {"allowed": False, "reason": "query_not_allowed"}, 403)
+            if params.get("stream") is True:
+                return self._stream_loki(
+                    loki, expr, start, end, limit, params, max_stream_lines, max_stream_seconds, timer
+                )
             if self.test_mode:
-                fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "observability" / "fixtures" / "loki.json")
+                with timer.span("fixture"):
+                    fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "observability" / "fixtures" / "loki.json")
                 fixture["source"] = "fixture"
                 return ({"ok": True, "data": fixture}, {"allowed": True, "reason": "fixture"}, 200)
             if os.environ.get("OBS_LIVE") != "1":
                 return ({"ok": False, "error": "live_disabled"}, {"allowed": False, "reason": "live_disabled"}, 403)
-            data = loki_query(loki.get("base_url"), expr, start, end, limit)
+            with timer.span("upstream"):
+                data = loki_query(loki.get("base_url"), expr, start, end, limit)
             return ({"ok": True, "data": data}, {"allowed": True, "reason": "live"}, 200)
 
         return ({"ok": False, "error": "unknown_action"}, {"allowed": False, "reason": "unknown_action"}, 400)
 
-    def _handle_runbooks(self, action, params):
+    def _stream_loki(self, loki, expr, start, end, limit, params, max_stream_lines, max_stream_seconds, timer):
+        direction = params.get("direction", "backward")
+        if direction not in {"forward", "backward"}:
+            return ({"ok": False, "error": "direction_invalid"}, {"allowed": False, "reason": "direction_invalid"}, 400)
+        page_limit = max(1, min(limit, MAX_LOKI_PAGE_LIMIT))
+        if self.test_mode:
+            with timer.span("fixture"):
+                fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "observability" / "fixtures" / "loki.json")
+
+            def fetch_page(page_start, page_end, page_size, page_direction):
+                return fixture_loki_page(fixture, page_start, page_end, page_size, page_direction)
+
+            reason = "fixture"
+        else:
+            if os.environ.get("OBS_LIVE") != "1":
+                return ({"ok": False, "error": "live_disabled"}, {"allowed": False, "reason": "live_disabled"}, 403)
+            base_url = loki.get("base_url")
+
+            def fetch_page(page_start, page_end, page_size, page_direction):
+                with timer.span("upstream"):
+                    return loki_query(base_url, expr, page_start, page_end, page_size, page_direction)
+
+            reason = "live"
+        meta = {"source": reason, "direction": direction, "page_limit": page_limit}
+        records = loki_stream_records(
+            fetch_page,
+            start * 1_000_000_000,
+            end * 1_000_000_000,
+            direction,
+            page_limit,
+            max_stream_lines,
+            time.monotonic() + max_stream_seconds,
+            params.get("dedup") is True,
+            params.get("patterns") is True,
+            meta,
+        )
+        return (NDJSONStream(records, meta), {"allowed": True, "reason": reason}, 200)
+
+    def _handle_runbooks(self, action, params, timer):
         roots = self.allowlist.get("roots", [])
         if action == "list_runbooks":
             items = []
-            for root in roots:
-                root_prefix = normalize_relpath(root)
-                root_path = (self.repo_root / root_prefix).resolve()
-                if root_path.exists():
-                    items.extend([f"{root_prefix}/{item}" for item in list_files(root_path)])
+            with timer.span("list"):
+                for root in roots:
+                    root_prefix = normalize_relpath(root)
+                    root_path = (self.repo_root / root_prefix).resolve()
+                    if root_path.exists():
+                        items.extend([f"{root_prefix}/{item}" for item in list_files(root_path)])
             return ({"ok": True, "data": {"runbooks": items}}, {"allowed": True, "reason": "ok"}, 200)
 
         if action == "read_runbook":
             target = params.get("path", "")
-            if not target or not path_allowed(target, roots, []):
-                return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
-            file_path = (self.repo_root / normalize_relpath(target)).resolve()
-            if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
-                return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
-            content, denied, _ = read_text_file(file_path, self.redaction_patterns)
+            with timer.span("path"):
+                if not target or not path_allowed(target, roots, []):
+                    return ({"ok": False, "error": "path_not_allowed"}, {"allowed": False, "reason": "path_not_allowed"}, 403)
+                file_path = (self.repo_root / normalize_relpath(target)).resolve()
+                if not is_relative_to(file_path, self.repo_root) or not file_path.is_file():
+                    return ({"ok": False, "error": "file_not_found"}, {"allowed": False, "reason": "file_not_found"}, 404)
+            content, denied, _ = read_text_file(file_path, self.redaction_patterns, timer)
             if denied:
                 return ({"ok": False, "error": "redacted"}, {"allowed": False, "reason": "redacted"}, 403)
             return (
@@ -516,7 +1191,7 @@ class MCPServer(HTTPServer):
 
         return ({"ok": False, "error": "unknown_action"}, {"allowed": False, "reason": "unknown_action"}, 400)
 
-    def _handle_qdrant(self, action, tenant, params):
+    def _handle_qdrant(self, action, tenant, params, timer):
         if action != "search":
             return ({"ok": False, "error": "unknown_action"}, {"allowed": False, "reason": "unknown_action"}, 400)
         vector = params.get("vector")
@@ -527,22 +1202,48 @@ class MCPServer(HTTPServer):
         top_k = int(params.get("top_k", 5))
         top_k = max(1, min(top_k, 10))
 
+        collection = "kb_platform" if tenant == "platform" else f"kb_tenant_{tenant}"
+        source_type = params.get("source_type")
+        # The local collection is only consulted in test mode or when Qdrant is
+        # unreachable, so a broken fallback never affects healthy live searches.
+        local = None
         if self.test_mode:
-            fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "qdrant" / "fixtures" / "search.json")
+            with timer.span("collection"):
+                local = self._local_collection(collection)
+        elif os.environ.get("QDRANT_LIVE") != "1":
+            return ({"ok": False, "error": "live_disabled"}, {"allowed": False, "reason": "live_disabled"}, 403)
+
+        use_cache = self.search_cache is not None and (local is not None or not self.test_mode)
+        if use_cache:
+            try:
+                cache_vector = [float(v) for v in vector]
+            except (TypeError, ValueError):
+                return ({"ok": False, "error": "vector_invalid"}, {"allowed": False, "reason": "vector_invalid"}, 400)
+            with timer.span("cache"):
+                version = self._collection_version(collection, local)
+                outcome, cached = self.search_cache.lookup(tenant, version, cache_vector, top_k, source_type)
+            if cached is not None:
+                cached["cache"] = outcome
+                return ({"ok": True, "data": cached}, {"allowed": True, "reason": f"cache_{outcome}"}, 200)
+
+        if self.test_mode:
+            if local is not None:
+                response = self._search_local(local, vector, top_k, source_type, "local", timer)
+                if use_cache and response[2] == 200:
+                    with timer.span("cache"):
+                        self.search_cache.store(tenant, version, cache_vector, top_k, source_type, response[0]["data"])
+                return response
+            with timer.span("fixture"):
+                fixture = build_fixture(self.repo_root / "ops" / "ai" / "mcp" / "qdrant" / "fixtures" / "search.json")
             fixture["source"] = "fixture"
             return ({"ok": True, "data": fixture}, {"allowed": True, "reason": "fixture"}, 200)
 
-        if os.environ.get("QDRANT_LIVE") != "1":
-            return ({"ok": False, "error": "live_disabled"}, {"allowed": False, "reason": "live_disabled"}, 403)
-
         qdrant_base = self.allowlist.get("base_url")
-        collection = "kb_platform" if tenant == "platform" else f"kb_tenant_{tenant}"
         payload = {
             "vector": vector,
             "limit": top_k,
             "with_payload": True,
         }
-        source_type = params.get("source_type")
         if source_type:
             payload["filter"] = {"must": [{"key": "source_type", "match": {"value": source_type}}]}
 
@@ -552,10 +1253,66 @@ class MCPServer(HTTPServer):
             headers={"Content-Type": "application/json"},
             method="POST",
         )
-        with urlopen(req, timeout=10) as resp:
-            result = json.loads(resp.read().decode("utf-8"))
+        try:
+            with timer.span("upstream"):
+                with urlopen(req, timeout=10) as resp:
+                    result = json.loads(resp.read().decode("utf-8"))
+        except HTTPError:
+            raise
+        except (URLError, OSError):
+            with timer.span("collection"):
+                local = self._local_collection(collection)
+            if local is None:
+                raise
+            return self._search_local(local, vector, top_k, source_type, "local_fallback", timer)
+        if use_cache:
+            with timer.span("cache"):
+                self.search_cache.store(tenant, version, cache_vector, top_k, source_type, result)
         return ({"ok": True, "data": result}, {"allowed": True, "reason": "live"}, 200)
 
+    def _collection_version(self, collection, local=None):
+        published = None
+        if COLLECTION_NAME_RE.match(collection):
+            try:
+                published = (self.index_versions_dir / f"{collection}.json").stat().st_mtime_ns
+            except OSError:
+                pass
+        cached = self.local_collections.get(collection) if local is not None else None
+        return (published, cached[0] if cached else None)
+
+    def _local_collection(self, name):
+        if self.qdrant_local_dir is None or not COLLECTION_NAME_RE.match(name):
+            return None
+        path = self.qdrant_local_dir / name
+        files = [path / "collection.json", path / "vectors.f32", path / "payloads.jsonl"]
+        if not all(item.is_file() for item in files):
+            return None
+        signature = tuple(item.stat().st_mtime_ns for item in files)
+        cached = self.local_collections.get(name)
+        if cached is None or cached[0] != signature:
+            try:
+                local = LocalCollection(path)
+            except (OSError, KeyError, TypeError, ValueError):
+                # Unreadable or inconsistent collections count as absent until
+                # their files change again.
+                local = None
+            cached = (signature, local)
+            self.local_collections[name] = cached
+        return cached[1]
+
+    def _search_local(self, local, vector, top_k, source_type, reason, timer):
+        try:
+            query = [float(v) for v in vector]
+        except (TypeError, ValueError):
+            return ({"ok": False, "error": "vector_invalid"}, {"allowed": False, "reason": "vector_invalid"}, 400)
+        try:
+            with timer.span("search"):
+                result = local.search(query, top_k, source_type)
+        except ValueError:
+            return ({"ok": False, "error": "vector_dim_mismatch"}, {"allowed": False, "reason": "vector_dim_mismatch"}, 400)
+        result["source"] = "local"
+        return ({"ok": True, "data": result}, {"allowed": True, "reason": reason}, 200)
+
 
 if __name__ == "__main__":
     port = int(os.environ.get("MCP_PORT", "8781"))
@@ -133,6 +133,28 @@ PY
   fi
 }
 
+assert_ndjson_summary() {
+  local label="$1"
+  local field="$2"
+  local expected="$3"
+  local response="$4"
+
+  if ! MCP_RESPONSE="${response}" python3 - <<PY
+import json
+import os
+records = [json.loads(line) for line in os.environ["MCP_RESPONSE"].splitlines() if line.strip()]
+summary = records[-1] if records else {}
+if summary.get("type") != "summary" or str(summary.get("${field}")) != "${expected}":
+    raise SystemExit(1)
+print("ok")
+PY
+  then
+    echo "ERROR: ${label} did not return summary ${field}=${expected}" >&2
+    echo "Response: ${response}" >&2
+    exit 1
+  fi
+}
+
 assert_audit_written() {
   local before="$1"
   local expected_delta="$2"
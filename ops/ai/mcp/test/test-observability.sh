@@ -36,6 +36,98 @@ response="$(mcp_post "http://127.0.0.1:${port}/query" \
   '{"action":"query_prometheus","params":{"query_name":"unknown","start":0,"end":300,"step":60}}' tenant canary)"
 assert_json_error "observability query denied" "query_not_allowed" "${response}"
 
-assert_audit_written "${before_audit}" 2
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"query_prometheus","params":{"query_name":"infra_cpu","start":0,"end":300,"step":60,"max_points":3,"summary":true}}' tenant canary)"
+assert_json_ok "observability query_prometheus reduced" "${response}"
+assert_json_field "observability reduction" "data.reduction.method" "lttb" "${response}"
+if ! MCP_RESPONSE="${response}" python3 - <<'PY'
+import json
+import os
+series = json.loads(os.environ["MCP_RESPONSE"])["data"]["data"]["result"][0]
+if series["values"] != [[0, "1"], [120, "4"], [300, "1.1"]]:
+    raise SystemExit(1)
+summary = series["summary"]
+expected = {"count": 6, "min": 0.8, "max": 4.0, "p95": 4.0, "last": 1.1}
+if any(summary.get(key) != value for key, value in expected.items()):
+    raise SystemExit(1)
+if abs(summary.get("avg", 0) - 1.6) > 1e-9:
+    raise SystemExit(1)
+PY
+then
+  echo "ERROR: observability reduction returned unexpected values/summary" >&2
+  echo "Response: ${response}" >&2
+  exit 1
+fi
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"query_prometheus","params":{"query_name":"infra_cpu","start":0,"end":300,"step":60,"max_points":2}}' tenant canary)"
+assert_json_error "observability reduction invalid" "reduction_invalid" "${response}"
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"query_loki","params":{"query_name":"syslog_errors","start":0,"end":300,"limit":2,"stream":true,"direction":"forward","dedup":true,"patterns":true}}' tenant canary)"
+assert_ndjson_summary "observability query_loki stream truncated" "truncated" "False" "${response}"
+assert_ndjson_summary "observability query_loki stream lines" "lines" "4" "${response}"
+assert_ndjson_summary "observability query_loki stream dedup" "duplicates" "1" "${response}"
+assert_ndjson_summary "observability query_loki stream no overflow" "boundary_overflow" "False" "${response}"
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"query_loki","params":{"query_name":"syslog_errors","start":0,"end":300,"limit":1,"stream":true,"direction":"forward"}}' tenant canary)"
+assert_ndjson_summary "observability query_loki stream shared timestamp" "lines" "5" "${response}"
+assert_ndjson_summary "observability query_loki stream boundary recovered" "boundary_overflow" "False" "${response}"
+
+response="$(curl -sS --http1.0 \
+  -H "Content-Type: application/json" \
+  -H "X-MCP-Identity: tenant" \
+  -H "X-MCP-Tenant: canary" \
+  -d '{"action":"query_loki","params":{"query_name":"syslog_errors","start":0,"end":300,"stream":true}}' \
+  "http://127.0.0.1:${port}/query")"
+assert_ndjson_summary "observability query_loki stream http/1.0" "lines" "5" "${response}"
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"query_loki","params":{"query_name":"syslog_errors","start":0,"end":300,"stream":true,"direction":"sideways"}}' tenant canary)"
+assert_json_error "observability query_loki direction invalid" "direction_invalid" "${response}"
+
+if ! MCP_SERVER_DIR="${FABRIC_REPO_ROOT}/ops/ai/mcp/common" python3 - <<'PY'
+import os
+import sys
+import time
+
+sys.path.insert(0, os.environ["MCP_SERVER_DIR"])
+from server import fixture_loki_page, loki_stream_records
+
+fixture = {
+    "data": {
+        "result": [{"stream": {"job": "syslog"}, "values": [[str(ts), f"error {ts}"] for ts in (1, 2, 3)]}]
+    }
+}
+
+
+def fetch_page(start_ns, end_ns, limit, direction):
+    return fixture_loki_page(fixture, start_ns, end_ns, limit, direction)
+
+
+def walk(max_lines, deadline):
+    meta = {}
+    records = list(loki_stream_records(fetch_page, 0, 10, "forward", 2, max_lines, deadline, False, False, meta))
+    return records[-1]
+
+
+budget = time.monotonic() + 30
+summary = walk(3, budget)
+if summary["lines"] != 3 or summary["truncated"]:
+    raise SystemExit(f"window of exactly max_stream_lines reported truncated: {summary}")
+summary = walk(2, budget)
+if summary["lines"] != 2 or summary["truncated_reason"] != "max_stream_lines":
+    raise SystemExit(f"line cap not reported: {summary}")
+summary = walk(3, time.monotonic())
+if summary["pages"] != 0 or summary["truncated_reason"] != "max_stream_seconds":
+    raise SystemExit(f"time budget not reported: {summary}")
+PY
+then
+  echo "ERROR: observability query_loki stream limit checks failed" >&2
+  exit 1
+fi
+
+assert_audit_written "${before_audit}" 8
 
 echo "PASS: observability MCP"
@@ -16,6 +16,7 @@ require_ci_mode
 source "${FABRIC_REPO_ROOT}/ops/ai/mcp/test/common.sh"
 
 log_dir="$(mcp_log_dir)"
+export AI_INDEX_VERSIONS_DIR="${log_dir}/indexing-versions"
 port=18785
 pid="$(mcp_start_server "qdrant" "${port}" "${FABRIC_REPO_ROOT}/ops/ai/mcp/qdrant/server.sh" "${log_dir}")"
 
@@ -36,6 +37,98 @@ response="$(mcp_post "http://127.0.0.1:${port}/query" \
   '{"action":"search","params":{"vector":[]}}' tenant canary)"
 assert_json_error "qdrant vector missing" "vector_required" "${response}"
 
-assert_audit_written "${before_audit}" 2
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"search","params":{"vector":[0.9,0.5,0.0],"top_k":2,"source_type":"docs"}}' operator platform)"
+assert_json_ok "qdrant local search" "${response}"
+assert_json_field "qdrant local source" "data.source" "local" "${response}"
+if ! MCP_RESPONSE="${response}" python3 - <<'PY'
+import json
+import os
+result = json.loads(os.environ["MCP_RESPONSE"])["data"]["result"]
+paths = [item["payload"]["path"] for item in result]
+if paths != ["docs/ai/mcp.md", "docs/ai/overview.md"]:
+    raise SystemExit(1)
+PY
+then
+  echo "ERROR: qdrant local search returned unexpected ranking" >&2
+  echo "Response: ${response}" >&2
+  exit 1
+fi
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"search","params":{"vector":[0.9,0.5,0.0],"top_k":2,"source_type":"docs"}}' operator platform)"
+assert_json_field "qdrant cache hit" "data.cache" "hit" "${response}"
+
+metrics="$(curl -sS "http://127.0.0.1:${port}/metrics")"
+if ! grep -q 'mcp_search_cache_requests_total{mcp="qdrant",result="hit"} 1' <<<"${metrics}"; then
+  echo "ERROR: qdrant cache hit not exported" >&2
+  echo "Metrics: ${metrics}" >&2
+  exit 1
+fi
+
+mkdir -p "${AI_INDEX_VERSIONS_DIR}"
+echo '{"collection": "kb_platform"}' >"${AI_INDEX_VERSIONS_DIR}/kb_platform.json"
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"search","params":{"vector":[0.9,0.5,0.0],"top_k":2,"source_type":"docs"}}' operator platform)"
+assert_json_ok "qdrant search after publish" "${response}"
+if ! MCP_RESPONSE="${response}" python3 - <<'PY'
+import json
+import os
+if "cache" in json.loads(os.environ["MCP_RESPONSE"])["data"]:
+    raise SystemExit(1)
+PY
+then
+  echo "ERROR: qdrant cache served a result after a new collection version was published" >&2
+  echo "Response: ${response}" >&2
+  exit 1
+fi
+
+metrics="$(curl -sS "http://127.0.0.1:${port}/metrics")"
+for expected in \
+  'mcp_search_cache_invalidations_total{mcp="qdrant"} 1' \
+  'mcp_search_cache_requests_total{mcp="qdrant",result="miss"} 2'; do
+  if ! grep -qF "${expected}" <<<"${metrics}"; then
+    echo "ERROR: qdrant cache metrics missing: ${expected}" >&2
+    echo "Metrics: ${metrics}" >&2
+    exit 1
+  fi
+done
+
+if ! MCP_SERVER_DIR="${FABRIC_REPO_ROOT}/ops/ai/mcp/common" python3 - <<'PY'
+import os
+import sys
+
+sys.path.insert(0, os.environ["MCP_SERVER_DIR"])
+from server import SearchCache
+
+cache = SearchCache(8, 300, 0.99, 2)
+cache.store("canary", "v1", [1.0, 0.0, 0.0], 2, "docs", {"result": [{"id": 1}]})
+outcome, result = cache.lookup("canary", "v1", [1.0, 0.05, 0.0], 2, "docs")
+if outcome != "similar_hit" or result != {"result": [{"id": 1}]}:
+    raise SystemExit("similar query did not hit")
+if cache.lookup("canary", "v1", [1.0, 0.5, 0.0], 2, "docs")[0] is not None:
+    raise SystemExit("dissimilar query hit")
+if cache.lookup("canary", "v1", [1.0, 0.05, 0.0], 3, "docs")[0] is not None:
+    raise SystemExit("top_k mismatch hit")
+if cache.lookup("other", "v1", [1.0, 0.0, 0.0], 2, "docs")[0] is not None:
+    raise SystemExit("cross-tenant hit")
+if "other" in cache.tenants:
+    raise SystemExit("lookup miss created a tenant bucket")
+for tenant in ("t1", "t2"):
+    cache.store(tenant, "v1", [0.0, 1.0, 0.0], 2, "docs", {"result": []})
+if list(cache.tenants) != ["t1", "t2"]:
+    raise SystemExit(f"max_tenants not enforced: {list(cache.tenants)}")
+PY
+then
+  echo "ERROR: qdrant cache similarity threshold/tenant checks failed" >&2
+  exit 1
+fi
+
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"search","params":{"vector":[0.1,0.2]}}' operator platform)"
+assert_json_error "qdrant local dim mismatch" "vector_dim_mismatch" "${response}"
+
+assert_audit_written "${before_audit}" 6
 
 echo "PASS: qdrant MCP"
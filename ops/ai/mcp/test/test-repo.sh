@@ -39,6 +39,85 @@ response="$(mcp_post "http://127.0.0.1:${port}/query" \
   '{"action":"read_file","params":{"path":"README.md"}}' tenant canary)"
 assert_json_error "repo read_file denied" "path_not_allowed" "${response}"
 
-assert_audit_written "${before_audit}" 3
+response="$(mcp_post "http://127.0.0.1:${port}/query" \
+  '{"action":"read_file","params":{"path":"nope/\u0000x"}}' tenant canary)"
+assert_json_error "repo read_file denied before resolve" "path_not_allowed" "${response}"
+
+headers="$(curl -sS -D - -o /dev/null \
+  -H "Content-Type: application/json" \
+  -H "X-MCP-Identity: tenant" \
+  -H "X-MCP-Tenant: canary" \
+  -d '{"action":"read_file","params":{"path":"docs/README.md"}}' \
+  "http://127.0.0.1:${port}/query")"
+if ! grep -qi '^Server-Timing: .*total;dur=' <<<"${headers}"; then
+  echo "ERROR: repo read_file missing Server-Timing header" >&2
+  echo "Headers: ${headers}" >&2
+  exit 1
+fi
+
+assert_audit_written "${before_audit}" 5
+
+if ! grep -q '"timings_ms"' "$(mcp_latest_audit_dir)/response.meta.json"; then
+  echo "ERROR: audit response.meta.json missing timings_ms" >&2
+  exit 1
+fi
+
+status="$(curl -sS -o /dev/null -w '%{http_code}' \
+  -H "Content-Type: application/json" \
+  -H "X-MCP-Identity: tenant" \
+  -H "X-MCP-Tenant: canary" \
+  -d '[1]' \
+  "http://127.0.0.1:${port}/query")"
+if [[ "${status}" != "400" ]]; then
+  echo "ERROR: repo non-object body returned ${status}, expected 400" >&2
+  exit 1
+fi
+
+if ! FABRIC_REPO_ROOT="${FABRIC_REPO_ROOT}" MCP_SERVER_DIR="${FABRIC_REPO_ROOT}/ops/ai/mcp/common" python3 - <<'PY'
+import cProfile
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, os.environ["MCP_SERVER_DIR"])
+from server import MCPServer, write_audit
+
+control = Path(tempfile.mkdtemp()) / "profile.json"
+control.write_text('{"sample_rate": 5}', encoding="utf-8")
+state = SimpleNamespace(runner_mode="ci", profile_control=control, profile_state=(None, 0.0))
+if MCPServer.profile_sample_rate(state) != 0.0:
+    raise SystemExit("profiling sampled outside operator mode")
+state.runner_mode = "operator"
+if MCPServer.profile_sample_rate(state) != 1.0:
+    raise SystemExit("sample_rate not clamped to 1.0")
+control.write_text('{"sample_rate": 0.25}', encoding="utf-8")
+stat = control.stat()
+os.utime(control, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+if MCPServer.profile_sample_rate(state) != 0.25:
+    raise SystemExit("control file not re-read after change")
+shutil.rmtree(control.parent)
+
+profile = cProfile.Profile()
+profile.enable()
+sum(range(1000))
+profile.disable()
+audit_dir = write_audit(
+    Path(os.environ["FABRIC_REPO_ROOT"]), {"mcp": "repo"}, {"allowed": True}, {"profiled": True}, profile
+)
+try:
+    manifest = (audit_dir / "manifest.sha256").read_text(encoding="utf-8")
+    for name in ("profile.pstats", "profile.txt"):
+        if not (audit_dir / name).is_file() or name not in manifest:
+            raise SystemExit(f"audit missing {name}")
+finally:
+    shutil.rmtree(audit_dir)
+PY
+then
+  echo "ERROR: repo profiling checks failed" >&2
+  exit 1
+fi
 
 echo "PASS: repo MCP"